@@ -8,6 +8,16 @@ KAKAO_API_KEY = os.environ.get("KAKAO_API_KEY")
 if not KAKAO_API_KEY:
     raise ValueError("KAKAO_API_KEY 환경변수가 필요합니다")
 KAKAO_DIRECTIONS_API_URL = "https://apis-navi.kakaomobility.com/v1/directions"
+ROUTE_CACHE_MAX_SIZE = 4096  # 경로 캐시 최대 항목 수 (주소 쌍 기준)
+ROUTE_CACHE_MEMORY_TTL_SEC = 24 * 60 * 60  # 메모리 경로 캐시 보관 기간 (1일)
+ROUTE_CACHE_DB_PATH = os.environ.get("ROUTE_CACHE_DB")  # 디스크 경로 캐시 sqlite 파일 경로 (미설정 시 사용 안 함)
+ROUTE_CACHE_TTL_SEC = 30 * 24 * 60 * 60  # 디스크 경로 캐시 보관 기간 (30일)
+KAKAO_MAX_CONCURRENT_REQUESTS = 16  # 카카오 API 동시 호출 수 (스레드 풀 / 커넥션 풀 크기)
+KAKAO_RETRY_BASE_DELAY_SEC = 0.5  # 재시도 백오프 기본 대기 (초, 시도마다 2배 + 지터)
+KAKAO_RETRY_MAX_DELAY_SEC = 30  # 재시도 1회 대기 상한 (초, Retry-After 포함)
+KAKAO_RETRY_BUDGET_SEC = 30  # 경로 1건당 전체 재시도 시간 상한 (초)
+KAKAO_CIRCUIT_FAIL_MAX = 5  # 연속 장애 몇 회에 카카오 API 호출을 중단할지 (서킷 브레이커)
+KAKAO_CIRCUIT_RESET_SEC = 30  # 호출 중단 후 다시 시험 호출하기까지 대기 (초)
 
 # 시스템 기본 설정
 WORK_START_TIME = 9  # 오전 9시
@@ -3,7 +3,7 @@ Google Sheets API 연동 모듈
 """
 import os
 import json
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -53,6 +53,18 @@ class GoogleSheetsClient:
         Returns:
             Technician 객체 리스트
         """
+        return list(self.iter_technicians(range_name))
+    
+    def iter_technicians(self, range_name: str = "기사!A1:H500") -> Iterator[Technician]:
+        """
+        Google Sheets에서 기사 목록을 한 행씩 파싱하여 반환 (중간 리스트 없음)
+        
+        Args:
+            range_name: 읽을 범위 (예: "기사!A1:H500")
+        
+        Yields:
+            Technician 객체
+        """
         try:
             # 시트 읽기
             result = self.service.spreadsheets().values().get(
@@ -63,7 +75,7 @@ class GoogleSheetsClient:
             values = result.get('values', [])
             
             if len(values) < 2:
-                return []  # 헤더만 있거나 데이터가 없음
+                return  # 헤더만 있거나 데이터가 없음
             
             # 헤더 파싱
             headers = values[0]
@@ -73,47 +85,51 @@ class GoogleSheetsClient:
             if "id" not in header_map:
                 raise ValueError("헤더에 'id' 필드가 없습니다")
             
-            technicians = []
+            # 필드별 컬럼 인덱스는 헤더 기준으로 한 번만 계산 (없는 컬럼은 -1 → 기본값)
+            id_idx = header_map["id"]
+            field_columns = [
+                (header_map.get(field_name, -1), default)
+                for field_name, default in (
+                    ("name", ""),
+                    ("phone", ""),
+                    ("area", ""),
+                    ("service_types", ""),
+                    ("priority", "0"),
+                    ("overtime_allowed", "true"),
+                )
+            ]
             
             # 데이터 행 파싱
             for row in values[1:]:
                 # row 길이가 header보다 짧으면 빈 문자열로 채우기
                 padded_row = row + [""] * (len(headers) - len(row))
                 
-                tech_id = str(padded_row[header_map.get("id", 0)]).strip()
+                tech_id = str(padded_row[id_idx]).strip()
                 if not tech_id:
                     continue  # ID가 없으면 스킵
                 
-                # 필드 추출 (인덱스 범위 체크)
-                def get_field(field_name: str, default: str = "") -> str:
-                    idx = header_map.get(field_name, -1)
-                    if idx >= 0 and idx < len(padded_row):
-                        return str(padded_row[idx]).strip()
-                    return default
+                # 필드 추출
+                name, phone, area, service_types_str, priority_str, overtime_str = [
+                    str(padded_row[idx]).strip() if idx >= 0 else default
+                    for idx, default in field_columns
+                ]
                 
-                name = get_field("name", "")
-                phone = get_field("phone", "")
-                area = get_field("area", "")
-                
-                # service_types 파싱 (쉼표로 구분)
-                service_types_str = get_field("service_types", "")
-                service_types = [s.strip() for s in service_types_str.split(",") if s.strip()] if service_types_str else []
+                # service_types 파싱 (쉼표로 구분, 집합으로 저장)
+                service_types = frozenset(s.strip() for s in service_types_str.split(",") if s.strip()) if service_types_str else frozenset()
                 
                 # priority 파싱
-                priority_str = get_field("priority", "0")
                 try:
                     priority = int(priority_str)
                 except:
                     priority = 0
                 
                 # overtime_allowed 파싱
-                overtime_str = get_field("overtime_allowed", "true")
                 overtime_allowed = overtime_str.lower() in ("true", "1", "on", "yes", "y")
                 
                 # area를 home_address로 사용
                 home_address = area if area else ""
                 
-                technician = Technician(
+                yield Technician(
                     technician_id=tech_id,
                     home_address=home_address,
                     service_types=service_types,
@@ -123,9 +139,6 @@ class GoogleSheetsClient:
                     area=area,
                     priority=priority
                 )
-                technicians.append(technician)
-            
-            return technicians
             
         except HttpError as error:
             print(f"Google Sheets API 오류: {error}")
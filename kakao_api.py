@@ -1,26 +1,249 @@
 """
 카카오맵 길찾기 API 연동 (주소 기반, 캐시 및 재시도 포함)
 """
+import logging
+import math
+import orjson
+import random
+import re
 import requests
+import sqlite3
+import threading
 import time
-from typing import Optional
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from models import RouteInfo
 import config
 
 
+# 경로 조회 실패 등은 동시 조회 중에도 stdout 잠금을 잡지 않도록 logging으로 기록
+logger = logging.getLogger(__name__)
+
+# HTTP 세션 (keep-alive로 TCP/TLS 연결 재사용)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=config.KAKAO_MAX_CONCURRENT_REQUESTS,
+    pool_maxsize=config.KAKAO_MAX_CONCURRENT_REQUESTS
+))
+# 인증 헤더는 고정값이므로 세션 기본 헤더로 한 번만 설정
+_session.headers.update({
+    "Authorization": f"KakaoAK {config.KAKAO_API_KEY}",
+    "Content-Type": "application/json"
+})
+
+# 길찾기 요청의 고정 파라미터 (호출마다 출발지/도착지만 추가)
+# summary=true: 구간/안내 정보 없이 요약(거리, 소요 시간)만 받음 - RouteInfo는 요약만 사용
+_BASE_PARAMS = {
+    "waypoints": "",
+    "priority": "RECOMMEND",
+    "car_fuel": "GASOLINE",
+    "car_hipass": "false",
+    "alternatives": "false",
+    "road_details": "false",
+    "summary": "true"
+}
+
+# 여러 경로를 동시에 조회하기 위한 스레드 풀
+_executor = ThreadPoolExecutor(
+    max_workers=config.KAKAO_MAX_CONCURRENT_REQUESTS,
+    thread_name_prefix="kakao"
+)
+
+# 재시도 대상 HTTP 상태 코드 (레이트 리밋 / 일시적 서버 오류)
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+class _CircuitBreaker:
+    """
+    카카오 API 장애 시 빠르게 실패하기 위한 서킷 브레이커
+    
+    연속 fail_max회 장애(재시도 후에도 타임아웃/연결 오류/429/5xx)가 나면 열리고,
+    reset_timeout초 동안은 API를 호출하지 않습니다. 이후 한 건만 시험 호출하여
+    성공하면 닫고, 실패하면 다시 reset_timeout초 동안 엽니다.
+    """
+    
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """API 호출 가능 여부 (열린 상태면 False, 대기 시간이 지나면 시험 호출 1건만 True)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+    
+    def record_success(self):
+        """API 응답을 받음 (주소 오류 등 요청 단위 실패 포함)"""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.warning("카카오 API 서킷 브레이커 닫힘 (API 응답 복구)")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+    
+    def record_failure(self):
+        """API 장애로 조회 실패"""
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.fail_max):
+                if not self._probing:
+                    logger.error("카카오 API 서킷 브레이커 열림 (연속 %d회 장애, %s초간 호출 중단)", self._failures, self.reset_timeout)
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+_breaker = _CircuitBreaker(config.KAKAO_CIRCUIT_FAIL_MAX, config.KAKAO_CIRCUIT_RESET_SEC)
+
+# 경로 캐시 (주소 쌍 → (만료 시각, RouteInfo), LRU + TTL)
+# 성공한 조회만 저장 - 일시적인 API 오류가 캐시에 남지 않도록
+# 기사/작업 주소가 바뀌면 키가 달라지므로 기사 목록 갱신 시 비울 필요 없음
+_route_cache: "OrderedDict[Tuple[str, str], Tuple[float, RouteInfo]]" = OrderedDict()
+_route_cache_lock = threading.Lock()
+
+# 조회 중인 주소 쌍 (같은 쌍을 동시에 요청하면 API는 한 번만 호출하고 결과를 공유)
+_inflight: Dict[Tuple[str, str], Future] = {}
+_inflight_lock = threading.Lock()
+
+
+# 주소 끝의 참고 항목 괄호 - 예: "테헤란로 123 (역삼동, OO빌딩)"
+_TRAILING_PARENTHESES = re.compile(r'\s*\([^)]*\)\s*$')
+
+
+def _canon(address: str) -> str:
+    """
+    캐시 키용 주소 정규화 (같은 장소인데 표기만 다른 주소가 같은 키가 되도록)
+    
+    유니코드 NFC 정규화, 끝의 괄호 참고 항목 제거, 공백 정리, 소문자 변환.
+    API에는 원래 주소를 그대로 보냅니다.
+    """
+    address = unicodedata.normalize("NFC", address)
+    address = _TRAILING_PARENTHESES.sub("", address)
+    return " ".join(address.split()).lower()
+
+
+def _get_cached_route(key: Tuple[str, str]) -> Optional[RouteInfo]:
+    """캐시에서 경로 정보 조회 (없거나 만료되었으면 None)"""
+    with _route_cache_lock:
+        entry = _route_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, route_info = entry
+        if expires_at <= time.monotonic():
+            # 오래된 소요 시간은 교통 상황이 바뀌었을 수 있으므로 다시 조회
+            del _route_cache[key]
+            return None
+        
+        _route_cache.move_to_end(key)
+        return route_info
+
+
+def _put_cached_route(key: Tuple[str, str], route_info: RouteInfo):
+    """캐시에 경로 정보 저장 (최대 크기 초과 시 가장 오래 사용하지 않은 항목 제거)"""
+    with _route_cache_lock:
+        _route_cache[key] = (time.monotonic() + config.ROUTE_CACHE_MEMORY_TTL_SEC, route_info)
+        _route_cache.move_to_end(key)
+        if len(_route_cache) > config.ROUTE_CACHE_MAX_SIZE:
+            _route_cache.popitem(last=False)
+
+
+# 디스크 경로 캐시 (sqlite, ROUTE_CACHE_DB 설정 시에만 사용)
+# 메모리 캐시 아래 단계 - 서버 재시작 후에도, 워커 프로세스 간에도 조회 결과 재사용
+_disk_cache: Optional[sqlite3.Connection] = None
+_disk_cache_lock = threading.Lock()
+
+
+def _open_disk_cache() -> Optional[sqlite3.Connection]:
+    """디스크 캐시 DB 열기 (미설정 또는 실패 시 None → 메모리 캐시만 사용)"""
+    if not config.ROUTE_CACHE_DB_PATH:
+        return None
+    
+    try:
+        conn = sqlite3.connect(config.ROUTE_CACHE_DB_PATH, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")  # 여러 워커가 동시에 읽고 쓸 수 있도록
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS routes ("
+            "origin TEXT NOT NULL, dest TEXT NOT NULL, "
+            "distance_meters INTEGER NOT NULL, duration_seconds INTEGER NOT NULL, "
+            "duration_minutes REAL NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (origin, dest))"
+        )
+        conn.commit()
+        return conn
+    except sqlite3.Error as e:
+        logger.warning("경로 캐시 DB 열기 실패 (메모리 캐시만 사용): %s", e)
+        return None
+
+
+_disk_cache = _open_disk_cache()
+
+
+def _get_disk_cached_route(key: Tuple[str, str]) -> Optional[RouteInfo]:
+    """디스크 캐시에서 경로 정보 조회 (없거나 보관 기간이 지났으면 None)"""
+    if _disk_cache is None:
+        return None
+    
+    try:
+        with _disk_cache_lock:
+            row = _disk_cache.execute(
+                "SELECT distance_meters, duration_seconds, duration_minutes FROM routes "
+                "WHERE origin = ? AND dest = ? AND created_at >= ?",
+                (key[0], key[1], time.time() - config.ROUTE_CACHE_TTL_SEC)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("경로 캐시 DB 조회 실패: %s", e)
+        return None
+    
+    if row is None:
+        return None
+    return RouteInfo(distance_meters=row[0], duration_seconds=row[1], duration_minutes=row[2])
+
+
+def _put_disk_cached_route(key: Tuple[str, str], route_info: RouteInfo):
+    """디스크 캐시에 경로 정보 저장 (실패해도 배정에는 영향 없음)"""
+    if _disk_cache is None:
+        return
+    
+    try:
+        with _disk_cache_lock:
+            _disk_cache.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?)",
+                (key[0], key[1], route_info.distance_meters, route_info.duration_seconds,
+                 route_info.duration_minutes, time.time())
+            )
+            _disk_cache.commit()
+    except sqlite3.Error as e:
+        logger.warning("경로 캐시 DB 저장 실패: %s", e)
+
+
 def get_route_info_by_address(
     origin_address: str,
     dest_address: str,
     retry_count: int = 2
 ) -> Optional[RouteInfo]:
     """
-    카카오맵 길찾기 API를 사용하여 경로 정보 조회 (주소 기반, 재시도 포함)
+    카카오맵 길찾기 API를 사용하여 경로 정보 조회 (주소 기반, 캐시 및 재시도 포함)
     
     카카오맵 API는 도로명 주소와 지번 주소 모두를 지원합니다.
     예: 
     - 도로명: "서울시 강남구 테헤란로 123"
     - 지번: "서울시 강남구 역삼동 456"
     
+    같은 주소 쌍은 캐시에서 바로 반환합니다 (API 호출 없음, 공백/끝 괄호/대소문자 차이는 같은 주소로 봄).
+    다른 스레드가 같은 주소 쌍을 조회 중이면 새로 호출하지 않고 그 결과를 기다립니다.
+    메모리 캐시 → 디스크 캐시 (ROUTE_CACHE_DB 설정 시) → API 순서로 조회합니다.
+    카카오 API 장애로 서킷 브레이커가 열려 있으면 API를 호출하지 않고 바로 None을 반환합니다.
+    
     Args:
         origin_address: 출발지 주소 (도로명 또는 지번 주소)
         dest_address: 도착지 주소 (도로명 또는 지번 주소)
@@ -29,69 +252,162 @@ def get_route_info_by_address(
     Returns:
         RouteInfo 객체 또는 None (실패 시: 주소 인식 실패, API 오류 등)
     """
-    headers = {
-        "Authorization": f"KakaoAK {config.KAKAO_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    params = {
-        "origin": origin_address,
-        "destination": dest_address,
-        "waypoints": "",
-        "priority": "RECOMMEND",
-        "car_fuel": "GASOLINE",
-        "car_hipass": "false",
-        "alternatives": "false",
-        "road_details": "false"
-    }
-    
-    # 재시도 로직
+    cache_key = (_canon(origin_address), _canon(dest_address))
+    route_info = _get_cached_route(cache_key)
+    if route_info is not None:
+        return route_info
+    
+    with _inflight_lock:
+        future = _inflight.get(cache_key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight[cache_key] = future
+    
+    if not is_owner:
+        return future.result()
+    
+    try:
+        route_info = _load_route_info(cache_key, origin_address, dest_address, retry_count)
+        future.set_result(route_info)
+        return route_info
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[cache_key]
+
+
+def _load_route_info(
+    cache_key: Tuple[str, str],
+    origin_address: str,
+    dest_address: str,
+    retry_count: int
+) -> Optional[RouteInfo]:
+    """메모리 캐시 미스 시 디스크 캐시 → API 순서로 조회하고 캐시에 저장"""
+    # 직전에 다른 스레드의 조회가 끝났을 수 있으므로 메모리 캐시 재확인
+    route_info = _get_cached_route(cache_key)
+    if route_info is not None:
+        return route_info
+    
+    route_info = _get_disk_cached_route(cache_key)
+    if route_info is not None:
+        _put_cached_route(cache_key, route_info)
+        return route_info
+    
+    if not _breaker.allow():
+        return None
+    
+    try:
+        route_info = _request_route_info(origin_address, dest_address, retry_count)
+    except BaseException:
+        # 예상 못한 예외로 끝나도 시험 호출 상태가 남아 API 호출이 영구히 막히지 않도록 장애로 기록
+        _breaker.record_failure()
+        raise
+    if route_info is not None:
+        _put_cached_route(cache_key, route_info)
+        _put_disk_cached_route(cache_key, route_info)
+    return route_info
+
+
+def _should_retry(status_code: int) -> bool:
+    """재시도할 응답인지 (레이트 리밋 / 일시적 서버 오류만)"""
+    return status_code in _RETRYABLE_STATUS_CODES
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    재시도 전 대기 시간 (초)
+    
+    Retry-After 헤더가 있으면 그 값을 따르고, 없거나 쓸 수 없는 값이면 지수 백오프 + 지터를 사용합니다.
+    """
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            seconds = None  # HTTP-date 형식 등은 무시하고 백오프 사용
+        # nan/inf는 백오프 사용, 음수는 0으로 (time.sleep에 음수/nan을 넘기면 ValueError)
+        if seconds is not None and math.isfinite(seconds):
+            return min(max(0.0, seconds), config.KAKAO_RETRY_MAX_DELAY_SEC)
+    
+    delay = config.KAKAO_RETRY_BASE_DELAY_SEC * (2 ** attempt) * (1 + random.random() * 0.5)
+    return min(delay, config.KAKAO_RETRY_MAX_DELAY_SEC)
+
+
+def _request_route_info(
+    origin_address: str,
+    dest_address: str,
+    retry_count: int
+) -> Optional[RouteInfo]:
+    """카카오맵 길찾기 API 호출 (캐시 없이, 재시도 포함, 결과를 서킷 브레이커에 기록)"""
+    params = {"origin": origin_address, "destination": dest_address, **_BASE_PARAMS}
+    
+    # 재시도 로직 (429/5xx/타임아웃/연결 오류만 재시도, 그 외는 즉시 실패)
+    started = time.monotonic()
     last_error = None
+    api_responded = False  # 요청 단위 실패(주소 오류 등)는 장애로 보지 않음
     for attempt in range(retry_count + 1):
+        retry_after = None
         try:
-            response = requests.get(
+            response = _session.get(
                 config.KAKAO_DIRECTIONS_API_URL,
-                headers=headers,
                 params=params,
                 timeout=10
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 # 응답 데이터 검증
                 routes = data.get("routes", [])
                 if not routes:
                     # 주소를 인식하지 못한 경우 (도로명/지번 주소 오류 가능)
+                    # 같은 주소로 재시도해도 결과가 같으므로 즉시 종료
                     last_error = "주소를 인식하지 못했습니다. 도로명 주소 또는 지번 주소를 확인해주세요."
-                    if attempt < retry_count:
-                        time.sleep(0.5)
-                        continue
+                    api_responded = True
                     break
+                _breaker.record_success()
                 return RouteInfo.from_kakao_api(data)
             elif response.status_code == 400:
                 # 잘못된 주소 형식 (400 Bad Request)
                 try:
-                    error_data = response.json()
+                    error_data = orjson.loads(response.content)
                     error_msg = error_data.get("msg", "주소 형식 오류")
-                except:
+                except (orjson.JSONDecodeError, AttributeError):
                     error_msg = "주소 형식 오류"
                 last_error = f"주소 형식 오류 (400): {error_msg}"
                 # 400 에러는 재시도해도 의미 없으므로 즉시 종료
+                api_responded = True
                 break
             else:
                 last_error = f"API 오류: {response.status_code}"
-                if attempt < retry_count:
-                    time.sleep(0.5)  # 재시도 전 대기
-                    continue
-                    
-        except Exception as e:
+                if not _should_retry(response.status_code):
+                    # 인증 오류(401/403) 등 - 재시도해도 의미 없으므로 즉시 종료
+                    api_responded = True
+                    break
+                retry_after = response.headers.get("Retry-After")
+        
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            last_error = str(e)
+        except (requests.exceptions.RequestException, ValueError, AttributeError, TypeError, KeyError, IndexError) as e:
+            # 그 외 요청 오류 / 응답 파싱 오류 (orjson.JSONDecodeError, 예상과 다른 응답 구조 포함) - 재시도하지 않음
             last_error = str(e)
-            if attempt < retry_count:
-                time.sleep(0.5)
-                continue
+            api_responded = True
+            break
+        
+        if attempt < retry_count:
+            delay = _retry_delay(attempt, retry_after)
+            # 전체 재시도 시간 상한 (요청 처리 시간이 과도하게 늘어나지 않도록)
+            if time.monotonic() - started + delay > config.KAKAO_RETRY_BUDGET_SEC:
+                break
+            time.sleep(delay)
     
     # 모든 재시도 실패
-    print(f"경로 조회 실패 ({origin_address} → {dest_address}): {last_error}")
+    if api_responded:
+        _breaker.record_success()
+    else:
+        _breaker.record_failure()
+    logger.warning("경로 조회 실패 (%s → %s): %s", origin_address, dest_address, last_error)
     return None
 
 
@@ -116,11 +432,11 @@ def calculate_travel_time(
     """
     # 주소 검증 (빈 문자열 체크)
     if not origin_address or not origin_address.strip():
-        print(f"경고: 출발지 주소가 비어있습니다: {origin_address}")
+        logger.warning("출발지 주소가 비어있습니다: %r", origin_address)
         return fail_value
     
     if not dest_address or not dest_address.strip():
-        print(f"경고: 도착지 주소가 비어있습니다: {dest_address}")
+        logger.warning("도착지 주소가 비어있습니다: %r", dest_address)
         return fail_value
     
     route_info = get_route_info_by_address(origin_address, dest_address)
@@ -128,3 +444,29 @@ def calculate_travel_time(
         return route_info.duration_minutes
     # 실패 시 큰 값 반환 (선택에서 밀리도록)
     return fail_value
+
+
+def calculate_travel_times(
+    pairs: List[Tuple[str, str]],
+    fail_value: float = 9999.0
+) -> List[float]:
+    """
+    여러 (출발지, 도착지) 주소 쌍의 이동 시간을 한 번에 조회 (병렬)
+    
+    각 쌍은 calculate_travel_time과 같은 규칙으로 처리되며 (캐시, 실패 시 fail_value),
+    API 호출은 스레드 풀에서 동시에 실행됩니다.
+    
+    Args:
+        pairs: (출발지 주소, 도착지 주소) 목록
+        fail_value: API 실패 시 반환할 값 (기본 9999.0분)
+    
+    Returns:
+        pairs와 같은 순서의 이동 시간 (분) 목록
+    """
+    if len(pairs) <= 1:
+        return [calculate_travel_time(origin, dest, fail_value) for origin, dest in pairs]
+    
+    return list(_executor.map(
+        lambda pair: calculate_travel_time(pair[0], pair[1], fail_value),
+        pairs
+    ))
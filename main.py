@@ -4,26 +4,82 @@
 Make에서 HTTP 요청으로 호출되는 엔트리 포인트
 JSON 입력을 받아서 배정 결과를 JSON으로 출력
 """
-import json
+import asyncio
+import logging
 import os
 import threading
 import time
+import uuid
+import orjson
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import date
+from itertools import takewhile
+from operator import itemgetter
 from typing import List, Dict, Any, Tuple, Optional
 from models import Job, Technician, TechnicianState, SystemRules, Assignment
 from scheduler import Scheduler
 from google_sheets import GoogleSheetsClient
-from kakao_api import calculate_travel_time
+from kakao_api import calculate_travel_times
 
-app = FastAPI()
+# 로그 설정 (카카오 API 모듈 등은 logging 사용)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSON 응답 (fastapi.responses.ORJSONResponse는 deprecated라 직접 정의)"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 수명 주기 - 시작 시 초기화 (워커마다), 종료 시 주기적 갱신 태스크 취소"""
+    refresh_task = await initialize_server()
+    try:
+        yield
+    finally:
+        refresh_task.cancel()
+
+
+# 응답의 최종 직렬화는 기본으로 orjson (json.dumps 대신)
+# dict를 반환하면 jsonable_encoder는 그대로 실행됨 - 생략하려면 /assign처럼 ORJSONResponse(...)를 직접 반환
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+# 배정 결과 등 큰 JSON 응답은 gzip 압축 (클라이언트가 Accept-Encoding: gzip을 보낼 때만)
+# compresslevel 5: JSON은 기본값(9)과 압축률 차이가 작고 CPU는 훨씬 적게 사용
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # 전역 기사 저장소 (메모리)
-_technicians_storage: List[Technician] = []
+# 갱신 시 새 스냅샷으로 통째로 교체 (참조 대입은 원자적이므로 읽는 쪽은 락 불필요)
+# 스냅샷은 교체만 하고 내용은 수정하지 않음
+# top_by_service: 서비스 종류 -> 해당 서비스의 최고 priority 기사들 (로드 시 한 번만 계산)
+_technicians_snapshot: Dict[str, Any] = {"technicians": (), "top_by_service": {}, "loaded": False}
 _technician_states_storage: Dict[str, TechnicianState] = {}  # technician_id -> state
-_technicians_loaded: bool = False
-_technicians_lock = threading.Lock()  # 스레드 안전성을 위한 락
+
+# Google Sheets 클라이언트 (인증 정보/서비스 객체를 갱신마다 다시 만들지 않도록 재사용)
+_sheets_client: Optional[GoogleSheetsClient] = None
+_sheets_lock = threading.Lock()  # 주기적 갱신과 수동 갱신이 동시에 같은 클라이언트를 쓰거나 스냅샷을 순서 뒤바뀌어 교체하지 않도록
+
+# 필수 필드 (Make 데이터 계약) - 누락 시 에러 메시지에 이 순서대로 표시
+REQUIRED_JOB_FIELDS = ("job_id", "service_type", "address", "date", "duration_min")
+REQUIRED_TECHNICIAN_FIELDS = ("technician_id", "home_address", "service_types", "overtime_allowed")
+# 빠른 경로 체크용 (모든 키가 있고 값이 None이 아닌지 C 수준에서 한 번에 확인)
+_REQUIRED_JOB_FIELD_SET = frozenset(REQUIRED_JOB_FIELDS)
+_REQUIRED_TECHNICIAN_FIELD_SET = frozenset(REQUIRED_TECHNICIAN_FIELDS)
+_get_required_job_fields = itemgetter(*REQUIRED_JOB_FIELDS)
+_get_required_technician_fields = itemgetter(*REQUIRED_TECHNICIAN_FIELDS)
+
+# 백그라운드 배정 작업 (POST /assign/async → GET /assign/{task_id})
+ASSIGN_TASK_TTL_SEC = 3600  # 결과 보관 시간 (초)
+_assign_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="assign")
+_assign_tasks: Dict[str, Dict[str, Any]] = {}  # task_id -> {"status", "created_at", "status_code", "result"}
+_assign_tasks_lock = threading.Lock()
 
 
 # ==================== 필수 라우트 ====================
@@ -37,15 +93,13 @@ def root():
 @app.get("/health")
 def health():
     """헬스 체크 엔드포인트"""
-    with _technicians_lock:
-        technicians_count = len(_technicians_storage)
-        loaded = _technicians_loaded
+    snapshot = _technicians_snapshot
     
     return {
         "status": "ok",
         "service": "기사 배정 시스템",
-        "technicians_loaded": loaded,
-        "technicians_count": technicians_count
+        "technicians_loaded": snapshot["loaded"],
+        "technicians_count": len(snapshot["technicians"])
     }
 
 
@@ -58,77 +112,12 @@ async def create_job(request: Request):
     기존 배정 로직도 유지
     """
     try:
-        # JSON Body 읽기
-        job_data = await request.json()
-        print(f"POST /jobs 요청: {json.dumps(job_data, ensure_ascii=False, indent=2)}")
+        # JSON Body 읽기 (orjson으로 직접 파싱)
+        job_data = orjson.loads(await request.body())
+        print(f"POST /jobs 요청: {orjson.dumps(job_data, option=orjson.OPT_INDENT_2).decode()}")
         
-        # 기존 배정 로직 실행
-        try:
-            # 기사 목록 확인
-            with _technicians_lock:
-                if not _technicians_loaded or not _technicians_storage:
-                    # 기사 목록이 없어도 요구사항에 따라 {"ok": true} 반환
-                    print("경고: 기사 목록이 로드되지 않았습니다")
-                    return {"ok": True}
-                
-                technicians = _technicians_storage.copy()
-            
-            # job 필드 확인
-            if "job" not in job_data:
-                return {"ok": True}
-            
-            job_info = job_data["job"]
-            
-            # Job 객체 생성
-            try:
-                preferred_date = date.fromisoformat(job_info.get("preferred_date", ""))
-            except:
-                return {"ok": True}
-            
-            job = Job(
-                job_id=f"JOB_{preferred_date.isoformat()}_{int(time.time())}",
-                service_type=job_info.get("service_type", ""),
-                address=job_info.get("address", ""),
-                date=preferred_date,
-                duration_min=int(job_info.get("duration_min", 0)),
-                time_fixed=job_info.get("time_fixed", False),
-                fixed_start_time=job_info.get("fixed_start_time") or None,
-                slot_type=job_info.get("slot_type")
-            )
-            
-            if not job.service_type or not job.address:
-                return {"ok": True}
-            
-            # 배정 로직 실행
-            available_technicians = [
-                tech for tech in technicians
-                if tech.can_handle_service(job.service_type)
-            ]
-            
-            if not available_technicians:
-                return {"ok": True}
-            
-            # priority 정렬
-            available_technicians.sort(key=lambda t: t.priority, reverse=True)
-            
-            # 가장 적합한 기사 선택
-            best_technician = None
-            best_travel_time = float('inf')
-            
-            max_priority = available_technicians[0].priority
-            priority_group = [t for t in available_technicians if t.priority == max_priority]
-            
-            for tech in priority_group:
-                travel_time = calculate_travel_time(tech.home_address, job.address)
-                if travel_time < best_travel_time:
-                    best_travel_time = travel_time
-                    best_technician = tech
-            
-            if best_technician:
-                print(f"배정 완료: {best_technician.technician_id} ({best_technician.name})")
-        
-        except Exception as e:
-            print(f"배정 로직 실행 중 오류: {str(e)}")
+        # 기존 배정 로직 실행 (이벤트 루프를 막지 않도록 스레드 풀에서)
+        await run_in_threadpool(_run_job_assignment, job_data)
         
         # 요구사항: {"ok": true} 반환
         return {"ok": True}
@@ -138,6 +127,68 @@ async def create_job(request: Request):
         return {"ok": True}
 
 
+def _run_job_assignment(job_data: Dict[str, Any]):
+    """/jobs 요청의 배정 로직 (카카오 API 호출로 블로킹되므로 스레드 풀에서 실행)"""
+    try:
+        # 기사 목록 확인 (스냅샷은 불변이므로 복사 없이 사용)
+        snapshot = _technicians_snapshot
+        if not snapshot["loaded"] or not snapshot["technicians"]:
+            # 기사 목록이 없어도 요구사항에 따라 {"ok": true} 반환 (create_job에서)
+            print("경고: 기사 목록이 로드되지 않았습니다")
+            return
+        
+        top_by_service = snapshot["top_by_service"]
+        
+        # job 필드 확인
+        if "job" not in job_data:
+            return
+        
+        job_info = job_data["job"]
+        
+        # Job 객체 생성
+        try:
+            preferred_date = date.fromisoformat(job_info.get("preferred_date", ""))
+        except:
+            return
+        
+        job = Job(
+            job_id=f"JOB_{preferred_date.isoformat()}_{int(time.time())}",
+            service_type=job_info.get("service_type", ""),
+            address=job_info.get("address", ""),
+            date=preferred_date,
+            duration_min=int(job_info.get("duration_min", 0)),
+            time_fixed=job_info.get("time_fixed", False),
+            fixed_start_time=job_info.get("fixed_start_time") or None,
+            slot_type=job_info.get("slot_type")
+        )
+        
+        if not job.service_type or not job.address:
+            return
+        
+        # 배정 로직 실행 (서비스별 최고 priority 기사 그룹은 로드 시 계산됨)
+        priority_group = top_by_service.get(job.service_type)
+        
+        if not priority_group:
+            return
+        
+        # 가장 적합한 기사 선택
+        best_technician = None
+        best_travel_time = float('inf')
+        
+        # 후보 기사들의 이동 시간을 한 번에 동시 조회
+        travel_times = calculate_travel_times([(tech.home_address, job.address) for tech in priority_group])
+        for tech, travel_time in zip(priority_group, travel_times):
+            if travel_time < best_travel_time:
+                best_travel_time = travel_time
+                best_technician = tech
+        
+        if best_technician:
+            print(f"배정 완료: {best_technician.technician_id} ({best_technician.name})")
+    
+    except Exception as e:
+        print(f"배정 로직 실행 중 오류: {str(e)}")
+
+
 # ==================== 기존 로직 유지 ====================
 
 def parse_json_input(json_data: Dict[str, Any]) -> Tuple[List[Job], List[Technician], List[Dict[str, Any]], List[TechnicianState], SystemRules]:
@@ -169,15 +220,22 @@ def parse_json_input(json_data: Dict[str, Any]) -> Tuple[List[Job], List[Technic
         default_buffer_min=int(rules_data.get("default_buffer_min", 30))
     )
     
+    # 날짜 문자열 파싱 결과 캐시 (같은 날짜의 작업이 많으므로 문자열당 한 번만 파싱)
+    date_cache: Dict[str, date] = {}
+    
+    def parse_date(value: str) -> date:
+        parsed = date_cache.get(value)
+        if parsed is None:
+            parsed = date_cache[value] = date.fromisoformat(value)
+        return parsed
+    
     # jobs 파싱
     for job_data in json_data.get("jobs", []):
-        # 필수 필드 체크
-        required_fields = ["job_id", "service_type", "address", "date", "duration_min"]
-        missing_fields = [f for f in required_fields if job_data.get(f) is None]
-        
-        if missing_fields:
+        # 필수 필드 체크 (누락이 있을 때만 누락 목록 생성)
+        if not job_data.keys() >= _REQUIRED_JOB_FIELD_SET or None in _get_required_job_fields(job_data):
+            missing_fields = [f for f in REQUIRED_JOB_FIELDS if job_data.get(f) is None]
             try:
-                job_date = date.fromisoformat(job_data.get("date", "2000-01-01"))
+                job_date = parse_date(job_data.get("date", "2000-01-01"))
             except:
                 job_date = date.today()
             
@@ -194,7 +252,7 @@ def parse_json_input(json_data: Dict[str, Any]) -> Tuple[List[Job], List[Technic
         
         # 날짜 파싱
         try:
-            job_date = date.fromisoformat(job_data["date"])
+            job_date = parse_date(job_data["date"])
         except (ValueError, TypeError):
             job = Job(
                 job_id=job_data["job_id"],
@@ -241,10 +299,8 @@ def parse_json_input(json_data: Dict[str, Any]) -> Tuple[List[Job], List[Technic
     
     # technicians 파싱
     for tech_data in json_data.get("technicians", []):
-        required_fields = ["technician_id", "home_address", "service_types", "overtime_allowed"]
-        missing_fields = [f for f in required_fields if tech_data.get(f) is None]
-        
-        if missing_fields:
+        if not tech_data.keys() >= _REQUIRED_TECHNICIAN_FIELD_SET or None in _get_required_technician_fields(tech_data):
+            missing_fields = [f for f in REQUIRED_TECHNICIAN_FIELDS if tech_data.get(f) is None]
             skipped_technicians.append({
                 "technician_id": tech_data.get("technician_id", "UNKNOWN"),
                 "reason": f"필수 필드 누락: {', '.join(missing_fields)}",
@@ -255,7 +311,7 @@ def parse_json_input(json_data: Dict[str, Any]) -> Tuple[List[Job], List[Technic
         technician = Technician(
             technician_id=tech_data["technician_id"],
             home_address=tech_data["home_address"],
-            service_types=list(tech_data["service_types"]),
+            service_types=frozenset(tech_data["service_types"]),
             overtime_allowed=bool(tech_data["overtime_allowed"])
         )
         technicians.append(technician)
@@ -354,72 +410,74 @@ def generate_human_message(
         if len(skipped_technicians) > 3:
             messages.append(f"  ... 외 {len(skipped_technicians) - 3}명")
     
-    all_jobs = assigned_jobs + failed_jobs + deferred_jobs
-    fallback_used = [a for a in all_jobs if a.job.fallback_used]
-    if fallback_used:
+    # 기본값 사용 작업 수 (목록을 합치거나 만들지 않고 개수만 셈)
+    fallback_count = sum(
+        1
+        for job_list in (assigned_jobs, failed_jobs, deferred_jobs)
+        for assignment in job_list
+        if assignment.job.fallback_used
+    )
+    if fallback_count:
         messages.append("")
-        messages.append(f"📌 중요: 기본값 사용된 작업 {len(fallback_used)}건")
+        messages.append(f"📌 중요: 기본값 사용된 작업 {fallback_count}건")
         messages.append("  (duration_min 누락/0일 때 서비스별 기본값 사용)")
         messages.append("  → 상세는 결과 데이터의 fallback_details 참조")
     
     return "\n".join(messages)
 
 
-@app.post('/assign')
-async def assign_jobs(request: Request):
-    """작업 배정 API 엔드포인트"""
+def run_assignment(body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """
+    배정 요청 본문을 받아 배정 실행
+    
+    /assign (동기)과 /assign/async (백그라운드)에서 공통으로 사용
+    
+    Returns:
+        (HTTP 상태 코드, 응답 본문)
+    """
     try:
-        input_data = await request.json()
+        input_data = orjson.loads(body)
         
         if not input_data:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "machine_output": {
-                        "success": False,
-                        "error": "요청 데이터가 없습니다",
-                        "assigned_jobs": [],
-                        "failed_jobs": [],
-                        "deferred_jobs": [],
-                        "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
-                    },
-                    "human_message": "❌ 오류: 요청 데이터가 없습니다."
-                }
-            )
+            return 400, {
+                "machine_output": {
+                    "success": False,
+                    "error": "요청 데이터가 없습니다",
+                    "assigned_jobs": [],
+                    "failed_jobs": [],
+                    "deferred_jobs": [],
+                    "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
+                },
+                "human_message": "❌ 오류: 요청 데이터가 없습니다."
+            }
         
         jobs, technicians, skipped_technicians, technician_states, system_rules = parse_json_input(input_data)
         
         if not jobs:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "machine_output": {
-                        "success": False,
-                        "error": "작업 데이터가 없습니다",
-                        "assigned_jobs": [],
-                        "failed_jobs": [],
-                        "deferred_jobs": [],
-                        "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
-                    },
-                    "human_message": "⚠️ 작업 데이터가 없습니다."
-                }
-            )
+            return 400, {
+                "machine_output": {
+                    "success": False,
+                    "error": "작업 데이터가 없습니다",
+                    "assigned_jobs": [],
+                    "failed_jobs": [],
+                    "deferred_jobs": [],
+                    "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
+                },
+                "human_message": "⚠️ 작업 데이터가 없습니다."
+            }
         
         if not technicians:
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "machine_output": {
-                        "success": False,
-                        "error": "기사 데이터가 없습니다",
-                        "assigned_jobs": [],
-                        "failed_jobs": [],
-                        "deferred_jobs": [],
-                        "summary": {"total_jobs": len(jobs), "assigned": 0, "failed": 0, "deferred": 0}
-                    },
-                    "human_message": f"⚠️ 기사 데이터가 없습니다. 작업 {len(jobs)}건이 배정되지 않았습니다."
-                }
-            )
+            return 400, {
+                "machine_output": {
+                    "success": False,
+                    "error": "기사 데이터가 없습니다",
+                    "assigned_jobs": [],
+                    "failed_jobs": [],
+                    "deferred_jobs": [],
+                    "summary": {"total_jobs": len(jobs), "assigned": 0, "failed": 0, "deferred": 0}
+                },
+                "human_message": f"⚠️ 기사 데이터가 없습니다. 작업 {len(jobs)}건이 배정되지 않았습니다."
+            }
         
         scheduler = Scheduler(technicians, technician_states, system_rules)
         assigned_jobs, failed_jobs, deferred_jobs = scheduler.assign_jobs(jobs)
@@ -427,39 +485,107 @@ async def assign_jobs(request: Request):
         machine_output = format_machine_output(assigned_jobs, failed_jobs, deferred_jobs, skipped_technicians)
         human_message = generate_human_message(assigned_jobs, failed_jobs, deferred_jobs, skipped_technicians)
         
-        return {
+        return 200, {
             "machine_output": machine_output,
             "human_message": human_message
         }
         
     except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "machine_output": {
-                    "success": False,
-                    "error": str(e),
-                    "assigned_jobs": [],
-                    "failed_jobs": [],
-                    "deferred_jobs": [],
-                    "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
-                },
-                "human_message": f"❌ 시스템 오류: {str(e)}"
-            }
-        )
+        return 500, {
+            "machine_output": {
+                "success": False,
+                "error": str(e),
+                "assigned_jobs": [],
+                "failed_jobs": [],
+                "deferred_jobs": [],
+                "summary": {"total_jobs": 0, "assigned": 0, "failed": 0, "deferred": 0}
+            },
+            "human_message": f"❌ 시스템 오류: {str(e)}"
+        }
+
+
+@app.post('/assign')
+async def assign_jobs(request: Request):
+    """작업 배정 API 엔드포인트"""
+    # 배정은 카카오 API 호출로 블로킹되므로 스레드 풀에서 실행 (이벤트 루프가 다른 요청을 계속 처리)
+    status_code, content = await run_in_threadpool(run_assignment, await request.body())
+    # 배정 결과는 작업 수에 비례해 커지므로 orjson으로 직렬화
+    return ORJSONResponse(status_code=status_code, content=content)
+
+
+@app.post('/assign/async')
+async def submit_assign_task(request: Request):
+    """
+    작업 배정 비동기 요청
+    
+    배정은 백그라운드에서 실행하고 즉시 202와 task_id를 반환합니다.
+    결과는 GET /assign/{task_id}로 조회합니다 (Make 웹훅 타임아웃 회피용).
+    """
+    body = await request.body()
+    task_id = uuid.uuid4().hex
+    
+    with _assign_tasks_lock:
+        _prune_assign_tasks()
+        _assign_tasks[task_id] = {"status": "pending", "created_at": time.time()}
+    
+    _assign_executor.submit(_run_assign_task, task_id, body)
+    return ORJSONResponse(status_code=202, content={"task_id": task_id, "status": "pending"})
+
+
+@app.get('/assign/{task_id}')
+def get_assign_task(task_id: str):
+    """비동기 배정 결과 조회"""
+    with _assign_tasks_lock:
+        task = _assign_tasks.get(task_id)
+    
+    if task is None:
+        raise HTTPException(status_code=404, detail="배정 작업을 찾을 수 없습니다")
+    
+    if task["status"] != "done":
+        return {"task_id": task_id, "status": task["status"]}
+    
+    # 결과가 /assign 응답 전체만큼 클 수 있으므로 dict 반환(jsonable_encoder 경유) 대신 바로 orjson 직렬화
+    return ORJSONResponse(content={
+        "task_id": task_id,
+        "status": "done",
+        "status_code": task["status_code"],
+        "result": task["result"]
+    })
+
+
+def _run_assign_task(task_id: str, body: bytes):
+    """백그라운드 배정 실행 후 결과 저장"""
+    status_code, content = run_assignment(body)
+    with _assign_tasks_lock:
+        task = _assign_tasks.get(task_id)
+        if task is not None:
+            task.update(status="done", status_code=status_code, result=content)
+
+
+def _prune_assign_tasks():
+    """보관 기간이 지난 배정 결과 삭제 (_assign_tasks_lock 안에서 호출)"""
+    expire_before = time.time() - ASSIGN_TASK_TTL_SEC
+    expired = [tid for tid, task in _assign_tasks.items() if task["created_at"] < expire_before]
+    for tid in expired:
+        del _assign_tasks[tid]
 
 
 def load_technicians_from_sheets() -> bool:
     """Google Sheets에서 기사 목록 로드"""
-    global _technicians_storage, _technicians_loaded
+    global _technicians_snapshot, _sheets_client
     
     try:
-        sheets_client = GoogleSheetsClient()
-        technicians = sheets_client.read_technicians(range_name="기사!A1:H500")
-        
-        with _technicians_lock:
-            _technicians_storage = technicians
-            _technicians_loaded = True
+        # 스냅샷 교체까지 잠금 안에서 - 갱신이 겹쳐도 먼저 읽은 목록이 나중에 게시되어 최신 목록을 덮어쓰지 않도록
+        with _sheets_lock:
+            if _sheets_client is None:
+                _sheets_client = GoogleSheetsClient()
+            technicians = tuple(_sheets_client.iter_technicians(range_name="기사!A1:H500"))
+            
+            _technicians_snapshot = {
+                "technicians": technicians,
+                "top_by_service": _index_top_technicians_by_service(technicians),
+                "loaded": True
+            }
         
         print(f"Technicians loaded: {len(technicians)}")
         return True
@@ -469,14 +595,31 @@ def load_technicians_from_sheets() -> bool:
         return False
 
 
-def periodic_refresh():
-    """주기적으로 기사 목록 갱신 (백그라운드 스레드)"""
+def _index_top_technicians_by_service(technicians: Tuple[Technician, ...]) -> Dict[str, Tuple[Technician, ...]]:
+    """서비스 종류별 최고 priority 기사 그룹 (같은 priority는 시트 순서 유지)"""
+    # 전체를 priority 내림차순으로 한 번만 정렬 (안정 정렬이므로 시트 순서 유지)
+    technicians_by_priority = sorted(technicians, key=lambda t: t.priority, reverse=True)
+    
+    by_service: Dict[str, List[Technician]] = defaultdict(list)
+    for tech in technicians_by_priority:
+        for service_type in tech.service_types:  # 집합이므로 시트에 중복 입력된 서비스도 한 번만
+            by_service[service_type].append(tech)
+    
+    # 각 서비스 목록은 priority 내림차순이므로 최고 priority 구간에서 멈춤
+    return {
+        service_type: tuple(takewhile(lambda t, top=techs[0].priority: t.priority == top, techs))
+        for service_type, techs in by_service.items()
+    }
+
+
+async def periodic_refresh():
+    """주기적으로 기사 목록 갱신 (이벤트 루프 태스크, Sheets 호출은 스레드 풀에서)"""
     refresh_interval = int(os.environ.get("TECHNICIANS_REFRESH_INTERVAL", 600))
     
     while True:
-        time.sleep(refresh_interval)
+        await asyncio.sleep(refresh_interval)
         print("기사 목록 주기적 갱신 시작...")
-        load_technicians_from_sheets()
+        await run_in_threadpool(load_technicians_from_sheets)
 
 
 @app.post('/refresh-technicians')
@@ -487,35 +630,32 @@ def refresh_technicians():
     if success:
         return {
             "status": "ok",
-            "count": len(_technicians_storage)
+            "count": len(_technicians_snapshot["technicians"])
         }
     else:
         raise HTTPException(status_code=500, detail="기사 목록 갱신 실패")
 
 
-def initialize_server():
+async def initialize_server() -> asyncio.Task:
     """
     서버 초기화 함수
     - 기사 목록 로드
-    - 주기적 갱신 스레드 시작
+    - 주기적 갱신 태스크 시작
+    
+    Returns:
+        주기적 갱신 태스크 (서버 종료 시 취소)
     """
     print("서버 시작: 기사 목록 로드 중...")
-    load_technicians_from_sheets()
+    await run_in_threadpool(load_technicians_from_sheets)
     
-    refresh_thread = threading.Thread(target=periodic_refresh, daemon=True)
-    refresh_thread.start()
-    print("주기적 갱신 스레드 시작됨")
-
-
-# 서버 시작 시 초기화
-@app.on_event("startup")
-async def startup_event():
-    """FastAPI startup 이벤트"""
-    initialize_server()
+    refresh_task = asyncio.create_task(periodic_refresh())
+    print("주기적 갱신 태스크 시작됨")
+    return refresh_task
 
 
 if __name__ == "__main__":
     import uvicorn
-    initialize_server()
+    # 초기화는 각 워커의 lifespan에서 실행됨
     port = int(os.environ.get("PORT", 5000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
@@ -1,21 +1,50 @@
 """
 데이터 모델 정의 - Make 데이터 계약에 맞춘 구조
 """
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, FrozenSet
 from datetime import datetime, date
 
 
-@dataclass
+def _parse_hhmm(value) -> Optional[int]:
+    """HH:MM (또는 HH) 문자열을 자정 기준 분 단위로 변환 (형식 오류 시 None)"""
+    try:
+        time_parts = value.split(':')
+        hour = int(time_parts[0])
+        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+        return hour * 60 + minute
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+def _format_hhmm(minutes: Optional[int]) -> Optional[str]:
+    """자정 기준 분 단위를 HH:MM 문자열로 변환 (None이면 None)"""
+    if minutes is None:
+        return None
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@dataclass(slots=True)
 class SystemRules:
     """시스템 운영 정책"""
     work_start: str  # HH:mm 형식
     work_end: str  # HH:mm 형식
     max_preassign_days: int
     default_buffer_min: int
+    
+    # 분 단위 변환값 (생성 시 한 번만 계산, 스케줄러 비교용)
+    work_start_minutes: int = field(init=False, repr=False)
+    work_end_minutes: int = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        work_start_hour, work_start_min = map(int, self.work_start.split(':'))
+        work_end_hour, work_end_min = map(int, self.work_end.split(':'))
+        self.work_start_minutes = work_start_hour * 60 + work_start_min
+        self.work_end_minutes = work_end_hour * 60 + work_end_min
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     """작업 정보 (Make 계약)"""
     job_id: str  # 필수
@@ -34,17 +63,24 @@ class Job:
     fallback_details: List[str] = field(default_factory=list)
     error_reason: Optional[str] = None  # 배정 실패 시 이유
     
+    # fixed_start_time의 분 단위 변환값 (생성 시 한 번만 계산, 형식 오류면 None)
+    fixed_start_minutes: Optional[int] = field(init=False, default=None, repr=False)
+    
+    def __post_init__(self):
+        if self.fixed_start_time:
+            self.fixed_start_minutes = _parse_hhmm(self.fixed_start_time)
+    
     def is_time_fixed(self) -> bool:
         """시간이 지정되었는지 여부"""
         return self.time_fixed is True
 
 
-@dataclass
+@dataclass(slots=True)
 class Technician:
     """기사 정보 (Make 계약)"""
     technician_id: str  # 필수
     home_address: str  # 필수 (집 주소)
-    service_types: List[str]  # 필수
+    service_types: FrozenSet[str]  # 필수 (집합 - 서비스 가능 여부를 O(1)로 확인)
     overtime_allowed: bool  # 필수
     # 추가 필드 (Google Sheets용)
     name: str = ""
@@ -57,7 +93,7 @@ class Technician:
         return service_type in self.service_types
 
 
-@dataclass
+@dataclass(slots=True)
 class TechnicianState:
     """기사 현재 상태 (Make 계약 - 선택적)"""
     technician_id: str
@@ -65,9 +101,9 @@ class TechnicianState:
     last_end_time: Optional[str] = None  # ISO string
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RouteInfo:
-    """경로 정보 (카카오맵 API 결과)"""
+    """경로 정보 (카카오맵 API 결과, 캐시에서 공유되므로 불변)"""
     distance_meters: int  # 거리 (미터)
     duration_seconds: int  # 소요 시간 (초)
     duration_minutes: float  # 소요 시간 (분)
@@ -90,59 +126,69 @@ class RouteInfo:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     """배정 정보"""
     job: Job
     technician: Technician
-    estimated_start_time: Optional[str] = None  # HH:MM
-    estimated_end_time: Optional[str] = None  # HH:MM
+    estimated_start_minutes: Optional[int] = None  # 시작 시간 (자정 기준 분)
+    estimated_end_minutes: Optional[int] = None  # 종료 시간 (자정 기준 분, 버퍼 포함)
     travel_time_minutes: float = 0  # 이동 시간 (분)
     status: str = "assigned"  # assigned, time_undefined, failed
     memo: str = ""
     
+    @property
+    def estimated_start_time(self) -> Optional[str]:
+        """시작 시간 (HH:MM, 출력용)"""
+        return _format_hhmm(self.estimated_start_minutes)
+    
+    @property
+    def estimated_end_time(self) -> Optional[str]:
+        """종료 시간 (HH:MM, 출력용)"""
+        return _format_hhmm(self.estimated_end_minutes)
+    
     def to_dict(self) -> dict:
         """Make 연동용 딕셔너리로 변환"""
+        job = self.job
+        
+        # 시간 처리 (시간 미정 작업은 시작/종료 시간 없이 통화 조율 메모)
+        if job.is_time_fixed():
+            start_time, end_time, time_status = self.estimated_start_time, self.estimated_end_time, "fixed"
+            time_memo = ""
+        else:
+            start_time, end_time, time_status = None, None, "undefined"
+            time_memo = "" if self.status == "failed" else "시간 미정 - 전날 통화 조율"
+        
         result = {
-            "job_id": self.job.job_id,
+            "job_id": job.job_id,
             "technician_id": self.technician.technician_id,
-            "date": self.job.date.isoformat(),
-            "service_type": self.job.service_type,
-            "address": self.job.address,
-            "duration_min": self.job.duration_min,
+            "date": job.date.isoformat(),
+            "service_type": job.service_type,
+            "address": job.address,
+            "duration_min": job.duration_min,
             "travel_time_minutes": round(self.travel_time_minutes, 1),
             "status": self.status,
-            "fallback_used": self.job.fallback_used,
-            "fallback_details": list(self.job.fallback_details) if self.job.fallback_details else [],
+            "fallback_used": job.fallback_used,
+            "fallback_details": list(job.fallback_details) if job.fallback_details else [],
+            "start_time": start_time,
+            "end_time": end_time,
+            "time_status": time_status,
         }
         
         # 에러 정보
-        if self.job.error_reason:
-            result["error_reason"] = self.job.error_reason
+        if job.error_reason:
+            result["error_reason"] = job.error_reason
         
-        # 시간 처리
-        if self.job.is_time_fixed():
-            result["start_time"] = self.estimated_start_time
-            result["end_time"] = self.estimated_end_time
-            result["time_status"] = "fixed"
-        else:
-            result["start_time"] = None
-            result["end_time"] = None
-            result["time_status"] = "undefined"
-            if self.status != "failed":
-                result["memo"] = "시간 미정 - 전날 통화 조율"
+        # 메모 병합 (배정 메모 / 시간 미정 메모)
+        if self.memo and time_memo:
+            result["memo"] = f"{self.memo} / {time_memo}"
+        elif self.memo or time_memo:
+            result["memo"] = self.memo or time_memo
         
-        # 메모 병합
-        if self.memo:
-            if result.get("memo"):
-                result["memo"] = f"{self.memo} / {result['memo']}"
-            else:
-                result["memo"] = self.memo
-            
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class TechnicianWorkingState:
     """기사 작업 상태 (배정 진행 중)"""
     technician: Technician
@@ -150,6 +196,10 @@ class TechnicianWorkingState:
     assignments_by_date: dict = field(default_factory=dict)  # 날짜별 배정 목록 {date: [Assignment]}
     last_work_end_time: Optional[str] = None  # 마지막 작업 종료 시간 (HH:MM)
     last_work_date: Optional[date] = None  # 마지막 작업 날짜
+    latest_assigned_date: Optional[date] = field(default=None, init=False)  # 배정된 날짜 중 가장 늦은 날짜 (add_assignment에서 갱신)
+    # 날짜별 시간 고정 배정의 시작/종료 분 (시작 시간 순 정렬, 같은 인덱스끼리 한 배정 - 충돌 체크에서 이분 탐색용)
+    fixed_starts_by_date: dict = field(default_factory=dict, init=False, repr=False)  # {date: [int]}
+    fixed_ends_by_date: dict = field(default_factory=dict, init=False, repr=False)  # {date: [int]}
     
     def get_assignments_for_date(self, target_date: date) -> List[Assignment]:
         """특정 날짜의 배정 목록 반환"""
@@ -161,6 +211,14 @@ class TechnicianWorkingState:
         if date_key not in self.assignments_by_date:
             self.assignments_by_date[date_key] = []
         self.assignments_by_date[date_key].append(assignment)
+        if assignment.estimated_end_minutes is not None:
+            starts = self.fixed_starts_by_date.setdefault(date_key, [])
+            ends = self.fixed_ends_by_date.setdefault(date_key, [])
+            index = bisect_right(starts, assignment.job.fixed_start_minutes)
+            starts.insert(index, assignment.job.fixed_start_minutes)
+            ends.insert(index, assignment.estimated_end_minutes)
+        if self.latest_assigned_date is None or date_key > self.latest_assigned_date:
+            self.latest_assigned_date = date_key
     
     def get_assigned_days_count(self) -> int:
         """배정된 날짜 수 반환"""
@@ -168,13 +226,11 @@ class TechnicianWorkingState:
     
     def can_assign_date(self, target_date: date, max_preassign_days: int) -> bool:
         """해당 날짜에 배정 가능한지 (max_preassign_days 제한 체크)"""
-        assigned_days = sorted(self.assignments_by_date.keys())
-        if len(assigned_days) < max_preassign_days:
+        if len(self.assignments_by_date) < max_preassign_days:
             return True
         
         # 최대 일수가 모두 채워진 경우, 가장 늦은 날짜 이후만 가능
-        if assigned_days:
-            latest_date = max(assigned_days)
-            return target_date > latest_date
+        if self.latest_assigned_date is not None:
+            return target_date > self.latest_assigned_date
         
         return True
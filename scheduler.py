@@ -1,13 +1,31 @@
 """
 배정 알고리즘 핵심 로직 (Make 데이터 계약 준수)
 """
+from bisect import bisect_right
+from collections import defaultdict
 from typing import List, Optional, Tuple, Dict
 from datetime import date, datetime, timedelta
 from models import (
     Job, Technician, TechnicianState, TechnicianWorkingState,
     SystemRules, Assignment
 )
-from kakao_api import calculate_travel_time
+from kakao_api import calculate_travel_times
+
+
+# 배정 실패 시 Assignment에 넣는 기사 (모든 실패 배정이 공유, 수정하지 않음)
+_FAILED_TECHNICIAN = Technician(
+    technician_id="FAILED",
+    home_address="",
+    service_types=frozenset(),
+    overtime_allowed=False
+)
+
+
+def _job_sort_key(job: Job) -> Tuple[date, bool, int, str]:
+    """배정 처리 순서 정렬 키 (날짜, 시간 미정 여부, 시작 분, 서비스 종류)"""
+    is_time_fixed = job.is_time_fixed()
+    start_minutes = job.fixed_start_minutes if is_time_fixed and job.fixed_start_minutes is not None else -1
+    return job.date, not is_time_fixed, start_minutes, job.service_type or ""
 
 
 class Scheduler:
@@ -24,6 +42,10 @@ class Scheduler:
         self.system_rules = system_rules
         self.working_states: Dict[str, TechnicianWorkingState] = {}
         
+        # 이동 시간 메모 ((출발지, 도착지) → 분, 이번 배정 동안만 유지)
+        # 실패 값(fail_value)도 저장 - 같은 배정 안에서 실패한 쌍을 다시 조회하지 않도록
+        self._travel_time_memo: Dict[Tuple[str, str], float] = {}
+        
         # 기사별 상태 초기화 (technician_states에서 복원 또는 기본값 사용)
         state_dict = {ts.technician_id: ts for ts in technician_states}
         
@@ -41,6 +63,12 @@ class Scheduler:
                 current_address=current_address,
                 last_work_end_time=state.last_end_time if state else None
             )
+        
+        # 서비스 종류별 가능 기사 목록 (배정 중 기사/서비스 종류는 바뀌지 않으므로 한 번만 구성)
+        self._by_service: Dict[str, List[TechnicianWorkingState]] = defaultdict(list)
+        for working_state in self.working_states.values():
+            for service_type in working_state.technician.service_types:
+                self._by_service[service_type].append(working_state)
     
     def assign_jobs(self, jobs: List[Job]) -> Tuple[List[Assignment], List[Assignment], List[Assignment]]:
         """
@@ -56,6 +84,10 @@ class Scheduler:
         failed_jobs = []
         deferred_jobs = []
         
+        # 날짜순 → 같은 날은 시간 고정 작업 먼저(시작 시간순) → 서비스 종류별로 묶어서 처리
+        # 시간 고정 작업은 기존 배정이 모두 끝난 뒤에만 들어갈 수 있으므로 시작 시간순으로 넣어야 배정 실패가 줄어듦
+        jobs = sorted(jobs, key=_job_sort_key)
+        
         for job in jobs:
             if job.error_reason:
                 assignment = self._create_failed_assignment(job, job.error_reason)
@@ -86,10 +118,7 @@ class Scheduler:
             Assignment 또는 None (3일 제한으로 배정 못한 경우)
         """
         # 1. 서비스 가능한 기사 필터링
-        available_working_states = [
-            ws for ws in self.working_states.values()
-            if ws.technician.can_handle_service(job.service_type)
-        ]
+        available_working_states = self._by_service.get(job.service_type, ())
         
         if not available_working_states:
             # 서비스 가능한 기사가 없는 경우 - 실패 처리
@@ -110,12 +139,16 @@ class Scheduler:
         best_score = float('inf')
         best_travel_time = 0.0
         
-        for working_state in assignable_states:
-            # 주소 기반 거리 계산
-            travel_time = calculate_travel_time(
-                working_state.current_address,
-                job.address
-            )
+        # 주소 기반 이동 시간 - 후보 기사 전체를 한 번에 병렬 조회 (메모에 없는 쌍만)
+        travel_times = self._get_travel_times([
+            (working_state.current_address, job.address)
+            for working_state in assignable_states
+        ])
+        
+        for working_state, travel_time in zip(assignable_states, travel_times):
+            # 점수(= 이동 시간)가 현재 최선보다 작을 수 없고 에러 원인도 이미 기록됐으면 시간 체크 생략
+            if travel_time >= best_score and job.error_reason:
+                continue
             
             # 시간 체크
             can_fit, score, error_reason = self._check_time_fit(working_state, job, travel_time)
@@ -145,6 +178,16 @@ class Scheduler:
         
         return assignment
     
+    def _get_travel_times(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """주소 쌍별 이동 시간 (메모에 없는 쌍만 중복 없이 한 번에 조회)"""
+        memo = self._travel_time_memo
+        missing = list(dict.fromkeys(pair for pair in pairs if pair not in memo))
+        if missing:
+            for pair, travel_time in zip(missing, calculate_travel_times(missing)):
+                memo[pair] = travel_time
+        
+        return [memo[pair] for pair in pairs]
+    
     def _check_time_fit(
         self,
         working_state: TechnicianWorkingState,
@@ -157,38 +200,27 @@ class Scheduler:
         Returns:
             (가능 여부, 점수, 에러 원인)
         """
-        # 같은 날짜의 기존 배정 목록
-        existing_assignments = working_state.get_assignments_for_date(job.date)
-        
         if job.is_time_fixed() and job.fixed_start_time:
             # 시간 고정 작업
-            return self._check_fixed_time_fit(working_state, job, travel_time, existing_assignments)
+            return self._check_fixed_time_fit(working_state, job, travel_time)
         else:
             # 시간 미지정 작업 - 슬롯만 체크
-            return self._check_undefined_time_fit(job, travel_time, existing_assignments, working_state.technician)
+            return self._check_undefined_time_fit(job, travel_time, working_state.technician)
     
     def _check_fixed_time_fit(
         self,
         working_state: TechnicianWorkingState,
         job: Job,
-        travel_time: float,
-        existing_assignments: List[Assignment]
+        travel_time: float
     ) -> Tuple[bool, float, Optional[str]]:
         """시간 고정 작업의 시간 체크"""
-        # fixed_start_time 파싱
-        try:
-            time_parts = job.fixed_start_time.split(':')
-            start_hour = int(time_parts[0])
-            start_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-            task_start_minutes = start_hour * 60 + start_minute
-        except (ValueError, IndexError, AttributeError):
+        # fixed_start_time은 Job 생성 시 분 단위로 변환됨 (None이면 형식 오류)
+        task_start_minutes = job.fixed_start_minutes
+        if task_start_minutes is None:
             return False, float('inf'), "시간 형식 오류"
         
         # 작업 종료 시간 계산
-        work_start_hour, work_start_min = map(int, self.system_rules.work_start.split(':'))
-        work_end_hour, work_end_min = map(int, self.system_rules.work_end.split(':'))
-        work_start_minutes = work_start_hour * 60 + work_start_min
-        work_end_minutes = work_end_hour * 60 + work_end_min
+        work_end_minutes = self.system_rules.work_end_minutes
         
         task_end_minutes = task_start_minutes + job.duration_min + self.system_rules.default_buffer_min
         
@@ -197,34 +229,21 @@ class Scheduler:
             if not working_state.technician.overtime_allowed:
                 return False, float('inf'), "OVERTIME_NOT_ALLOWED"
         
-        # 기존 배정과의 충돌 체크
-        for existing in existing_assignments:
-            if existing.job.is_time_fixed() and existing.job.fixed_start_time:
-                try:
-                    existing_parts = existing.job.fixed_start_time.split(':')
-                    existing_start_hour = int(existing_parts[0])
-                    existing_start_minute = int(existing_parts[1]) if len(existing_parts) > 1 else 0
-                    existing_start_minutes = existing_start_hour * 60 + existing_start_minute
-                    existing_end_minutes = existing_start_minutes + existing.job.duration_min + self.system_rules.default_buffer_min
-                    
-                    # 시간 겹침 체크
-                    if not (task_end_minutes <= existing_start_minutes or task_start_minutes >= existing_end_minutes):
-                        return False, float('inf'), "시간 충돌"
-                except (ValueError, IndexError):
-                    continue
-            
-            # 같은 날 이전 작업이 있는 경우 이동 시간 고려
-            if existing.estimated_end_time:
-                try:
-                    existing_end_parts = existing.estimated_end_time.split(':')
-                    existing_end_h = int(existing_end_parts[0])
-                    existing_end_m = int(existing_end_parts[1]) if len(existing_end_parts) > 1 else 0
-                    existing_end_minutes = existing_end_h * 60 + existing_end_m
-                    
-                    if existing_end_minutes + travel_time > task_start_minutes:
-                        return False, float('inf'), "이동 시간 부족"
-                except (ValueError, IndexError):
-                    pass
+        # 기존 배정과의 충돌 체크 (시간 미정 배정은 종료 시간이 없어 대상 아님)
+        # 기존 배정이 모두 끝나고 이동할 시간이 있어야 하므로, 종료 시간이 (시작 - 이동 시간)보다 늦은
+        # 첫 배정만 보면 됨. 배정은 이 체크를 통과해야 추가되므로 시작/종료 목록이 함께 정렬되어 있음
+        existing_ends = working_state.fixed_ends_by_date.get(job.date)
+        if existing_ends:
+            index = bisect_right(existing_ends, task_start_minutes - travel_time)
+            if index < len(existing_ends):
+                existing_start_minutes = working_state.fixed_starts_by_date[job.date][index]
+                
+                # 시간 겹침 체크
+                if task_end_minutes > existing_start_minutes and task_start_minutes < existing_ends[index]:
+                    return False, float('inf'), "시간 충돌"
+                
+                # 겹치지는 않지만 이동 시간 부족
+                return False, float('inf'), "이동 시간 부족"
         
         # 점수 = 이동 시간
         return True, travel_time, None
@@ -233,7 +252,6 @@ class Scheduler:
         self,
         job: Job,
         travel_time: float,
-        existing_assignments: List[Assignment],
         technician: Technician
     ) -> Tuple[bool, float, Optional[str]]:
         """시간 미지정 작업의 슬롯 체크 + overtime 체크"""
@@ -243,11 +261,9 @@ class Scheduler:
         # slot_type fallback: 없으면 ALLDAY
         slot_type = job.slot_type or "ALLDAY"
         
-        # work_start, work_end 파싱
-        work_start_hour, work_start_min = map(int, self.system_rules.work_start.split(':'))
-        work_end_hour, work_end_min = map(int, self.system_rules.work_end.split(':'))
-        work_start_minutes = work_start_hour * 60 + work_start_min
-        work_end_minutes = work_end_hour * 60 + work_end_min
+        # work_start, work_end (SystemRules 생성 시 분 단위로 변환됨)
+        work_start_minutes = self.system_rules.work_start_minutes
+        work_end_minutes = self.system_rules.work_end_minutes
         
         # 슬롯 크기 계산
         if slot_type == "MORNING":
@@ -291,18 +307,11 @@ class Scheduler:
         # time_fixed 처리
         if job.is_time_fixed() and job.fixed_start_time:
             assignment.status = "assigned"
-            assignment.estimated_start_time = job.fixed_start_time
             
-            # 종료 시간 계산
-            try:
-                time_parts = job.fixed_start_time.split(':')
-                start_hour = int(time_parts[0])
-                start_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-                start_minutes = start_hour * 60 + start_minute
-                end_minutes = start_minutes + job.duration_min + self.system_rules.default_buffer_min
-                assignment.estimated_end_time = self._minutes_to_time(end_minutes)
-            except (ValueError, IndexError):
-                pass
+            # 시작/종료 시간 (분 단위로 저장, HH:MM 문자열은 출력 시 변환)
+            if job.fixed_start_minutes is not None:
+                assignment.estimated_start_minutes = job.fixed_start_minutes
+                assignment.estimated_end_minutes = job.fixed_start_minutes + job.duration_min + self.system_rules.default_buffer_min
         else:
             assignment.status = "time_undefined"
         
@@ -310,18 +319,10 @@ class Scheduler:
     
     def _create_failed_assignment(self, job: Job, reason: str) -> Assignment:
         """배정 실패 케이스"""
-        # 임시 Technician 객체 생성
-        dummy_technician = Technician(
-            technician_id="FAILED",
-            home_address="",
-            service_types=[],
-            overtime_allowed=False
-        )
-        
         job.error_reason = reason
         assignment = Assignment(
             job=job,
-            technician=dummy_technician,
+            technician=_FAILED_TECHNICIAN,
             status="failed",
             memo=reason
         )
@@ -340,13 +341,7 @@ class Scheduler:
         # 위치 업데이트 (작업 위치로)
         working_state.current_address = assignment.job.address
         
-        # 마지막 작업 시간은 estimated_end_time이 있을 때만 업데이트
-        if assignment.estimated_end_time:
+        # 마지막 작업 시간은 종료 시간이 있을 때만 업데이트
+        if assignment.estimated_end_minutes is not None:
             working_state.last_work_end_time = assignment.estimated_end_time
             working_state.last_work_date = assignment.job.date
-    
-    def _minutes_to_time(self, minutes: int) -> str:
-        """분 단위를 HH:MM 형식으로 변환"""
-        hour = minutes // 60
-        minute = minutes % 60
-        return f"{hour:02d}:{minute:02d}"
\ No newline at end of file
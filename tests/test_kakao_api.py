@@ -0,0 +1,56 @@
+"""
+kakao_api 서킷 브레이커 테스트
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("KAKAO_API_KEY", "test")
+
+import kakao_api
+
+
+def _ok_response():
+    """카카오 API 정상 응답 (10분 거리)"""
+    response = mock.Mock(status_code=200)
+    response.content = b'{"routes": [{"summary": {"distance": 7000, "duration": 600000}}]}'
+    return response
+
+
+class CircuitBreakerProbeTest(unittest.TestCase):
+    """시험 호출(half-open) 중 예외가 나도 브레이커가 복구되는지"""
+    
+    def setUp(self):
+        breaker = kakao_api._CircuitBreaker(fail_max=1, reset_timeout=30)
+        patcher = mock.patch.object(kakao_api, "_breaker", breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = breaker
+    
+    def _open_breaker(self):
+        """브레이커를 열고 대기 시간이 지난 상태로 만듦 (다음 호출이 시험 호출)"""
+        self.breaker.record_failure()
+        self.breaker._opened_at -= self.breaker.reset_timeout
+    
+    def test_raising_probe_does_not_block_later_calls(self):
+        self._open_breaker()
+        
+        with mock.patch.object(kakao_api._session, "get", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                kakao_api.get_route_info_by_address("probe raise origin", "probe raise dest")
+        
+        # 시험 호출 실패로 다시 열림 (시험 호출 상태는 해제)
+        self.assertFalse(self.breaker._probing)
+        self.assertIsNotNone(self.breaker._opened_at)
+        
+        self.breaker._opened_at -= self.breaker.reset_timeout
+        with mock.patch.object(kakao_api._session, "get", return_value=_ok_response()):
+            travel_time = kakao_api.calculate_travel_time("probe ok origin", "probe ok dest")
+        
+        self.assertEqual(travel_time, 10.0)
+        self.assertIsNone(self.breaker._opened_at)
+        self.assertFalse(self.breaker._probing)
+
+
+if __name__ == "__main__":
+    unittest.main()